@@ -0,0 +1,78 @@
+import streamlit as st
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+
+# --- DOGE API ---
+DOGE_API_BASE = "https://api.doge.gov"
+PER_PAGE = 500
+MAX_WORKERS = 16
+
+@st.cache_resource
+def get_session():
+    # One pooled keep-alive session per process
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=MAX_WORKERS,
+        pool_maxsize=MAX_WORKERS,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504)),
+    )
+    session.mount("https://", adapter)
+    return session
+
+def fetch_page(session, endpoint, page):
+    params = {
+        "sort_by": "savings",
+        "sort_order": "desc",
+        "page": page,
+        "per_page": PER_PAGE,
+    }
+    response = session.get(f"{DOGE_API_BASE}{endpoint}", params=params, timeout=30)
+    response.raise_for_status()
+    data = response.json()
+    if not data.get("success"):
+        raise requests.RequestException(f"DOGE API returned an unsuccessful response for page {page}")
+    return data
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def fetch_paginated(endpoint, key):
+    # Every page of `endpoint` as a raw DataFrame built from data["result"][key]
+    session = get_session()
+
+    def records(page):
+        return fetch_page(session, endpoint, page)["result"].get(key, [])
+
+    first = fetch_page(session, endpoint, 1)
+    fetched = {1: first["result"].get(key, [])}  # page number -> records
+    total_pages = first.get("meta", {}).get("pages")
+
+    if total_pages is None:
+        # No paging metadata: probe by doubling until an empty page, keeping what was fetched
+        total_pages = 1
+        while True:
+            fetched[total_pages * 2] = records(total_pages * 2)
+            if not fetched[total_pages * 2]:
+                break
+            total_pages *= 2
+        total_pages = total_pages * 2 - 1
+    missing = [page for page in range(2, total_pages + 1) if page not in fetched]
+    if missing:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            fetched.update(zip(missing, executor.map(records, missing)))
+
+    return pd.DataFrame(list(chain.from_iterable(fetched[page] for page in range(1, total_pages + 1))))
+
+# --- Shared frame helpers ---
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+def weekday_categorical(dates):
+    # NaT -> code -1, i.e. missing
+    return pd.Categorical.from_codes(dates.dt.weekday.fillna(-1).astype("int8"), categories=WEEKDAYS, ordered=True)
+
+@st.cache_data(ttl=3600, max_entries=8, show_spinner=False)
+def to_csv_bytes(_df, data_version, filters):
+    # CSV download bytes per data version and filter selection; _df itself is not hashed
+    return _df.to_csv(index=False).encode("utf-8")
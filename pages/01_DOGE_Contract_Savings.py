@@ -1,98 +1,126 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import requests
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
 from io import BytesIO
-import base64
-from reportlab.lib.pagesizes import LETTER
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import inch
-from reportlab.lib.utils import ImageReader
-from reportlab.lib.colors import HexColor
-import plotly.io as pio
+from dataclasses import dataclass
 import re
-from fuzzywuzzy import fuzz
 import os
+from doge_api import fetch_paginated, to_csv_bytes, weekday_categorical
 
 st.set_page_config(page_title="DOGE Contract Savings", layout="wide")
 
+CACHE_DIR = "cache"
+SNAPSHOT_VERSION = 2  # bump whenever the derived columns or their dtypes change
+
 # --- Vendor Normalization ---
-def normalize_vendor_name(name):
-    if pd.isna(name) or not isinstance(name, str) or name.strip() == "":
-        return None
-    name = name.lower()
-    name = re.sub(r'\(.*?\)', '', name) # remove parenthesis
-    name = re.sub(r'[^\w\s]', '', name) # remove punctuation
-    name = re.sub(r'\b(inc|llc|ltd|corp|co|company|incorporated|services|solutions|consulting|financial|advisory|systems|group|holdings|partners|lp|llp)\b', '', name)
-    name = re.sub(r'\b(the|of|and|for|in|at|on|by|with|from)\b', '', name)
-    name = re.sub(r'\s+', ' ', name) # normalize whitespace
-    name = name.strip()
-    return name.split()[0].title() if name else None
+# Punctuation goes before suffix/stop words ("at&t" -> "att", not "t")
+_PAREN_PUNCT_RE = re.compile(r'\(.*?\)|[^\w\s]')
+_NOISE_RE = re.compile(  # corporate suffixes and stop words
+    r'\b(inc|llc|ltd|corp|co|company|incorporated|services|solutions|consulting|financial|advisory|systems|group|holdings|partners|lp|llp'
+    r'|the|of|and|for|in|at|on|by|with|from)\b'
+)
+
+def normalize_vendor_names(vendors):
+    # Cleans each distinct name once and maps the first remaining token back
+    unique_vendors = pd.Series(vendors.dropna().unique())
+    cleaned = (
+        unique_vendors.str.lower()
+        .str.replace(_PAREN_PUNCT_RE, "", regex=True)
+        .str.replace(_NOISE_RE, "", regex=True)
+    )
+    normalized = cleaned.str.split(n=1).str[0].str.title()
+    return vendors.map(dict(zip(unique_vendors, normalized)))
+
+def write_snapshot(df, cache_path):
+    # Temp file + rename so a partial write never becomes the snapshot; older snapshots are removed
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        df.to_parquet(tmp_path, engine="pyarrow", compression="zstd", index=False)
+        os.replace(tmp_path, cache_path)
+        for name in os.listdir(CACHE_DIR):
+            path = os.path.join(CACHE_DIR, name)
+            if name.startswith("contracts_") and name.endswith(".parquet") and path != cache_path:
+                os.remove(path)
+    except (OSError, TypeError, ValueError):
+        # disk cache is best-effort; the in-memory cache still applies
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
 
 @st.cache_data(ttl=3600)
 def get_contract_savings():
-    DOGE_API_BASE = "https://api.doge.gov"
-    ENDPOINT = "/savings/contracts"
-    PER_PAGE = 500
-    page = 1
-    all_contracts = []
-
-    while True:
-        url = f"{DOGE_API_BASE}{ENDPOINT}"
-        params = {
-            "sort_by": "savings",
-            "sort_order": "desc",
-            "page": page,
-            "per_page": PER_PAGE,
-        }
+    # Daily on-disk snapshot; the load time versions the caches built from the frame
+    import pyarrow as pa
+
+    loaded_at = datetime.now().isoformat()
+    cache_path = os.path.join(CACHE_DIR, f"contracts_v{SNAPSHOT_VERSION}_{datetime.now().strftime('%Y%m%d')}.parquet")
+    if os.path.exists(cache_path):
         try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            if not data.get("success"):
-                break
-            contracts = data["result"]["contracts"]
-            if not contracts:
-                break
-            all_contracts.extend(contracts)
-            page += 1
-        except:
-            break
-
-    df = pd.DataFrame(all_contracts)
-    df["deleted_date"] = pd.to_datetime(df["deleted_date"])
+            return pd.read_parquet(cache_path, engine="pyarrow"), loaded_at
+        except (OSError, pa.ArrowInvalid):
+            pass  # unreadable snapshot: refetch, and the rewrite below replaces it
+
+    df = fetch_paginated("/savings/contracts", "contracts")
+    # cache=True parses each distinct date string once
+    df["deleted_date"] = pd.to_datetime(df["deleted_date"], errors="coerce", cache=True)
     df["savings"] = pd.to_numeric(df["savings"], errors="coerce")
     df["month"] = df["deleted_date"].dt.to_period("M")
-    df["weekday"] = df["deleted_date"].dt.day_name()
-    df["vendor_normalized"] = df["vendor"].apply(normalize_vendor_name)
-    return df
+    df["weekday"] = weekday_categorical(df["deleted_date"])
+    df["vendor_normalized"] = normalize_vendor_names(df["vendor"])
+
+    # Categoricals so groupby works on integer codes
+    df["agency"] = df["agency"].astype("category")
+    df["vendor_normalized"] = df["vendor_normalized"].astype("category")
+
+    if not df.empty:
+        write_snapshot(df, cache_path)
+    return df, loaded_at
+
+@st.cache_data(ttl=3600)
+def aggregate_savings(_df, data_version, agencies, vendors):
+    # One groupby per dimension; keyed on the data version and filters, _df is not hashed
+    agency_sav = _df.groupby("agency", sort=False, observed=True)["savings"].sum()
+    vendor_sav = _df.groupby("vendor_normalized", sort=False, observed=True)["savings"].sum()
+    monthly_sav = _df.groupby("month", sort=True)["savings"].sum()
+    return agency_sav, vendor_sav, monthly_sav
 
 # --- Load and process data ---
-df = get_contract_savings()
+try:
+    df, data_version = get_contract_savings()
+except requests.RequestException as e:
+    st.error(f"❌ Error loading contract data from the DOGE API: {e}")
+    st.stop()
 
 # --- Sidebar Filters ---
 st.sidebar.header("🔍 Filter Data")
-agencies = st.sidebar.multiselect("Select Agencies", options=df["agency"].dropna().unique())
-vendors = st.sidebar.multiselect("Select Vendors", options=df["vendor_normalized"].dropna().unique())
-export_charts = True  # Always export charts
-
-if agencies:
-    df = df[df["agency"].isin(agencies)]
-if vendors:
-    df = df[df["vendor_normalized"].isin(vendors)]
+agencies = st.sidebar.multiselect("Select Agencies", options=df["agency"].cat.categories)
+vendors = st.sidebar.multiselect("Select Vendors", options=df["vendor_normalized"].cat.categories)
+
+if agencies or vendors:
+    # One combined mask, one slice
+    mask = np.ones(len(df), dtype=bool)
+    if agencies:
+        mask &= df["agency"].isin(agencies).to_numpy()
+    if vendors:
+        mask &= df["vendor_normalized"].isin(vendors).to_numpy()
+    df = df.loc[mask]
 
 if df.empty:
     st.warning("No data matches your filter criteria.")
     st.stop()
 
 # --- Metrics ---
+agency_sav, vendor_sav, monthly_sav = aggregate_savings(df, data_version, tuple(agencies), tuple(vendors))
 total_savings = df["savings"].sum()
 total_contracts = len(df)
-top_agency = df.groupby("agency")["savings"].sum().idxmax()
-top_vendor = df.groupby("vendor_normalized")["savings"].sum().idxmax()
-most_common_weekday = df["weekday"].value_counts().idxmax()
+top_agency = agency_sav.index[agency_sav.to_numpy().argmax()]
+top_vendor = vendor_sav.index[vendor_sav.to_numpy().argmax()]
+weekday_counts = df["weekday"].value_counts(sort=False)
+most_common_weekday = weekday_counts.idxmax()
 
 # --- Layout ---
 st.title("📊 Government Contract Cancellations Dashboard")
@@ -101,7 +129,7 @@ st.markdown("Analyze contract savings from the Department of Government Efficien
 # --- Download CSV ---
 st.download_button(
     label="📥 Download CSV",
-    data=df.to_csv(index=False).encode("utf-8"),
+    data=to_csv_bytes(df, data_version, (tuple(agencies), tuple(vendors))),
     file_name="doge_contract_savings.csv",
     mime="text/csv"
 )
@@ -117,27 +145,43 @@ col4, col5 = st.columns(2)
 col4.metric("⚠️ Top Affected Vendor", top_vendor)
 col5.metric("📅 Most Common Cancellation Day", most_common_weekday)
 
-# --- Generate charts and optionally export ---
-chart_images = {}
-
-def render_and_export_chart(fig, caption, key):
+# --- Generate charts ---
+def render_chart(fig, caption):
     st.plotly_chart(fig, use_container_width=True)
     st.caption(caption)
-    
-    if export_charts:
-        buffer = BytesIO()
-        try:
-            fig.write_image(buffer, format="png")
-            buffer.seek(0)
-            chart_images[key] = buffer
-        except Exception as e:
-            st.error(f"❌ Error exporting chart '{key}': {e}")
+
+def render_chart_png(kind, x, y, title):
+    # PDF copy of a dashboard chart via matplotlib's Agg backend (no headless browser)
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.ticker import StrMethodFormatter
+
+    fig = Figure(figsize=(6.5, 4.75), dpi=110)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    labels = [str(label) for label in x]
+    if kind == "barh":
+        ax.barh(labels, y)
+        ax.invert_yaxis()
+        ax.tick_params(axis="y", labelsize=8)
+        ax.tick_params(axis="x", labelsize=8, labelrotation=30)
+        ax.xaxis.set_major_formatter(StrMethodFormatter("${x:,.0f}"))
+    elif kind == "bar":
+        ax.bar(labels, y)
+    else:
+        ax.plot(labels, y, marker="o")
+        ax.yaxis.set_major_formatter(StrMethodFormatter("${x:,.0f}"))
+    ax.set_title(title)
+    fig.tight_layout()
+    buffer = BytesIO()
+    fig.canvas.print_png(buffer)
+    return buffer.getvalue()
 
 st.markdown("### 📊 Visualizations")
 col1, col2 = st.columns(2)
 
 with col1:
-    agency_data = df.groupby("agency")["savings"].sum().sort_values(ascending=False).head(10)
+    agency_data = agency_sav.nlargest(10)
     fig = go.Figure(go.Bar(
         x=agency_data.values,
         y=agency_data.index,
@@ -150,10 +194,10 @@ with col1:
         margin=dict(l=200, r=20, t=50, b=40))  # ⬅ increases left space
     fig.update_yaxes(automargin=True,tickfont=dict(size=10))
     fig.update_traces(constraintext="both")
-    render_and_export_chart(fig, "Top 10 agencies by cumulative savings.", "top_agencies")
+    render_chart(fig, "Top 10 agencies by cumulative savings.")
 
 with col2:
-    vendor_data = df.groupby("vendor_normalized")["savings"].sum().sort_values(ascending=False).head(10)
+    vendor_data = vendor_sav.nlargest(10)
     fig = go.Figure(go.Bar(
         x=vendor_data.values,
         y=vendor_data.index,
@@ -166,14 +210,14 @@ with col2:
         margin=dict(l=200, r=20, t=50, b=40))  # ⬅ increases left space
     fig.update_yaxes(automargin=True,tickfont=dict(size=10))
     fig.update_traces(constraintext="both")
-    render_and_export_chart(fig, "Top 10 vendors most affected by cancellations.", "top_vendors")
+    render_chart(fig, "Top 10 vendors most affected by cancellations.")
 
 col3, col4 = st.columns(2)
 
 with col3:
-    monthly = df.groupby(df["deleted_date"].dt.to_period("M"))["savings"].sum().reset_index()
+    monthly = monthly_sav.reset_index()
     monthly.columns = ["Month", "Savings"]
-    monthly["Month"] = monthly["Month"].astype(str)
+    monthly["Month"] = monthly["Month"].dt.to_timestamp()
     fig = px.line(
         monthly, 
         x="Month", 
@@ -181,20 +225,17 @@ with col3:
         markers=True, 
         title="Monthly Contract Savings")
     
-    render_and_export_chart(fig, "Monthly trend of contract cancellations.", "monthly_savings")
+    render_chart(fig, "Monthly trend of contract cancellations.")
 
 with col4:
-    weekday_counts = df["weekday"].value_counts().reindex(
-        ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-    ).fillna(0).reset_index()
-    weekday_counts.columns = ["Weekday", "Count"]
+    weekday_df = weekday_counts.rename_axis("Weekday").reset_index(name="Count")
     fig = px.bar(
-        weekday_counts, 
+        weekday_df, 
         x="Weekday", 
         y="Count", 
         title="Cancellations by Weekday")
     
-    render_and_export_chart(fig, "Distribution of cancellations by weekday.", "weekday")
+    render_chart(fig, "Distribution of cancellations by weekday.")
 
     
 #####################    
@@ -204,239 +245,167 @@ with col4:
 st.markdown("---")
 st.markdown("### 📄 Downloadable PDF Report")
 
-pdf_output_path = f"DOGE_Contract_Summary_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf"
-c = canvas.Canvas(pdf_output_path, pagesize=LETTER)
-width, height = LETTER
-margin = 50
-line_height = 16
-cursor = height - margin
-page_number = 1
-
-footer_text = "Built by Richie Garafola • RichieGarafola@hotmail.com • github.com/RichieGarafola"
-
-def reset_cursor(): global cursor; cursor = height - margin
-def draw_title(title):
-    global cursor
-    c.setFont("Helvetica-Bold", 18)
-    c.setFillColor(HexColor("#003366"))
-    c.drawString(margin, cursor, title)
-    c.setFillColor(HexColor("#000000"))
-    cursor -= 30
-def draw_divider():
-    global cursor
-    c.setStrokeColor(HexColor("#888888"))
-    c.line(margin, cursor, width - margin, cursor)
-    cursor -= 10
-def draw_paragraph(text):
-    global cursor
-    c.setFont("Helvetica", 12)
-    for line in text.split("\n"):
-        c.drawString(margin, cursor, line)
-        cursor -= line_height
-def draw_footer():
-    global page_number
-    c.setFont("Helvetica-Oblique", 9)
-    c.drawString(margin, 20, footer_text)
-    c.drawRightString(width - margin, 20, f"Page {page_number}")
-    page_number += 1
-
-# --- Cover Page ---
-c.setFillColor(HexColor("#003366"))
-c.setFont("Helvetica-Bold", 24)
-c.drawCentredString(width / 2, height - 100, "DOGE Contract Savings Report")
-c.setFont("Helvetica", 16)
-c.setFillColor(HexColor("#000000"))
-c.drawCentredString(width / 2, height - 140, "Department of Government Efficiency")
-c.setFont("Helvetica", 12)
-c.drawCentredString(width / 2, height - 180, f"Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}")
-draw_footer()
-c.showPage()
-
-top_agency_savings = df.groupby("agency")["savings"].sum().max()
-vendor_loss = df.groupby("vendor_normalized")["savings"].sum().max()
-monthly_avg = df.groupby(df["deleted_date"].dt.to_period("M"))["savings"].sum().mean()
-monthly_totals = df.groupby(df["deleted_date"].dt.to_period("M"))["savings"].sum()
-peak_month = monthly_totals.idxmax().strftime('%B %Y')
-peak_savings = monthly_totals.max()
-
-# --- BLUF Section (Page 2) ---
-reset_cursor()
-draw_title("BLUF: Bottom Line Up Front")
-draw_divider()
-
-c.setFont("Helvetica-Bold", 12)
-c.drawString(margin, cursor, "✔ Total Canceled Savings:")
-cursor -= line_height
-c.setFont("Helvetica", 12)
-c.drawString(margin + 20, cursor, f"${total_savings:,.0f} across {total_contracts} contracts")
-cursor -= 2 * line_height
-
-c.setFont("Helvetica-Bold", 12)
-c.drawString(margin, cursor, "✔ Top Saving Agency:")
-cursor -= line_height
-c.setFont("Helvetica", 12)
-c.drawString(margin + 20, cursor, f"{top_agency}")
-cursor -= 2 * line_height
-
-c.setFont("Helvetica-Bold", 12)
-c.drawString(margin, cursor, "✔ Most Impacted Vendor:")
-cursor -= line_height
-c.setFont("Helvetica", 12)
-c.drawString(margin + 20, cursor, f"{top_vendor}")
-cursor -= 2 * line_height
-
-c.setFont("Helvetica-Bold", 12)
-c.drawString(margin, cursor, "✔ Most Common Cancellation Day:")
-cursor -= line_height
-c.setFont("Helvetica", 12)
-c.drawString(margin + 20, cursor, f"{most_common_weekday}")
-cursor -= 2 * line_height
-
-c.setFont("Helvetica-Bold", 12)
-c.drawString(margin, cursor, "✔ Peak Month of Savings:")
-cursor -= line_height
-c.setFont("Helvetica", 12)
-c.drawString(margin + 20, cursor, f"{peak_month} — ${peak_savings:,.0f}")
-cursor -= 2 * line_height
-
-draw_footer()
-c.showPage()
-
-
-# --- Table of Contents ---
-reset_cursor()
-draw_title("Table of Contents")
-draw_paragraph("1. BLUF\n2. Summary\n3. Automated Insights\n4. Top 20 Agencies\n5. Top 20 Vendors\n6. Charts")
-draw_footer()
-c.showPage()
-
-# --- Summary ---
-reset_cursor()
-draw_title("Summary")
-draw_paragraph("This report highlights key savings achieved through government contract cancellations.\nThe dashboard includes key metrics, trends, and automated insights from DOGE API.")
-cursor -= 10
-draw_title("Key Metrics")
-draw_paragraph(
-    f"- Total Savings: ${total_savings:,.0f}\n"
-    f"- Total Contracts Canceled: {total_contracts}\n"
-    f"- Top Saving Agency: {top_agency}\n"
-    f"- Top Affected Vendor: {top_vendor}\n"
-    f"- Most Common Cancellation Day: {most_common_weekday}"
-)
-draw_footer()
-c.showPage()
-
-# --- Automated Insights ---
-reset_cursor()
-draw_title("Automated Insights")
-draw_divider()
-
-
-
-insights = [
-    f"- {top_agency} saved the most: ${top_agency_savings:,.0f}.",
-    f"- {top_vendor} was most affected: ${vendor_loss:,.0f}.",
-    f"- Average monthly savings: ${monthly_avg:,.0f}.",
-    f"- Peak savings occurred in {peak_month} totaling ${peak_savings:,.0f}."
-]
-draw_paragraph("\n".join(insights))
-draw_footer()
-c.showPage()
-
-# --- Top 20 Agencies (Formatted Table) ---
-reset_cursor()
-draw_title("Top 20 Agencies by Canceled Savings")
-draw_divider()
-c.setFont("Courier", 11)
-top_agencies = df.groupby("agency")["savings"].sum().sort_values(ascending=False).head(20).reset_index()
-for _, row in top_agencies.iterrows():
-    c.drawString(margin, cursor, f"{row['agency']:<50} ${row['savings']:>15,.0f}")
-    cursor -= line_height
-draw_footer()
-c.showPage()
-
-# --- Top 20 Vendors (Formatted Table) ---
-reset_cursor()
-draw_title("Top 20 Vendors by Canceled Value")
-draw_divider()
-c.setFont("Courier", 11)
-top_vendors = df.groupby("vendor_normalized")["savings"].sum().sort_values(ascending=False).head(20).reset_index()
-for _, row in top_vendors.iterrows():
-    c.drawString(margin, cursor, f"{row['vendor_normalized']:<50} ${row['savings']:>15,.0f}")
-    cursor -= line_height
-draw_footer()
-c.showPage()
-
-# --- Charts with Captions and Auto Insights ---
-chart_titles = {
-    "top_agencies": "Top 10 Agencies by Total Savings",
-    "top_vendors": "Top 10 Vendors by Canceled Contract Value",
-    "monthly_savings": "Monthly Contract Savings",
-    "weekday": "Cancellations by Weekday"
-}
-
-chart_captions = {
-    "top_agencies": "Agencies with the highest total savings.",
-    "top_vendors": "Vendors most financially impacted.",
-    "monthly_savings": "Trends in cancellations by month.",
-    "weekday": "Most common days for cancellations."
-}
-
-chart_insights = {
-    "top_agencies": [
-        f"- {top_agencies.iloc[0]['agency']} led with ${top_agencies.iloc[0]['savings']:,.0f} saved.",
-        f"- Total from Top 10 agencies: ${top_agencies['savings'].sum():,.0f}."
-    ],
-    "top_vendors": [
-        f"- {top_vendors.iloc[0]['vendor_normalized']} lost ${top_vendors.iloc[0]['savings']:,.0f}.",
-        f"- Total from Top 10 vendors: ${top_vendors['savings'].sum():,.0f}."
-    ],
-    "monthly_savings": [
-        f"- Peak month was {peak_month} with ${peak_savings:,.0f}.",
-        f"- Monthly average savings: ${monthly_avg:,.0f}."
-    ],
-    "weekday": [
-        f"- Most cancellations on {most_common_weekday}.",
-        f"- Weekday with fewest cancellations: {df['weekday'].value_counts().idxmin()}."
+@dataclass(frozen=True)
+class ReportMetrics:
+    # Contract figures quoted in the PDF text
+    top_agency_savings: float
+    top10_agency_savings: float
+    top_vendor_savings: float
+    top10_vendor_savings: float
+    monthly_avg: float
+    peak_month: str
+    peak_savings: float
+    least_common_weekday: str
+
+def report_metrics(top_agency_sav, top_vendor_sav, monthly_sav, weekday_counts):
+    # Inputs are already sorted descending (nlargest)
+    peak_idx = monthly_sav.to_numpy().argmax()
+    return ReportMetrics(
+        top_agency_savings=top_agency_sav.iloc[0],
+        top10_agency_savings=top_agency_sav.iloc[:10].sum(),
+        top_vendor_savings=top_vendor_sav.iloc[0],
+        top10_vendor_savings=top_vendor_sav.iloc[:10].sum(),
+        monthly_avg=monthly_sav.mean(),
+        peak_month=monthly_sav.index[peak_idx].strftime('%B %Y'),
+        peak_savings=monthly_sav.iloc[peak_idx],
+        least_common_weekday=weekday_counts.idxmin(),
+    )
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def build_pdf(total_savings, total_contracts, top_agency, top_vendor, most_common_weekday,
+              agency_sav, vendor_sav, monthly_sav, weekday_counts):
+    # ReportLab is only imported once a report is built
+    from pdf_writer import PDFWriter
+
+    pdf_buffer = BytesIO()
+    pdf = PDFWriter(pdf_buffer)
+
+    # --- Cover Page ---
+    pdf.cover("DOGE Contract Savings Report")
+
+    top_agency_sav = agency_sav.nlargest(20)
+    top_vendor_sav = vendor_sav.nlargest(20)
+    m = report_metrics(top_agency_sav, top_vendor_sav, monthly_sav, weekday_counts)
+
+    # --- BLUF Section (Page 2) ---
+    pdf.title("BLUF: Bottom Line Up Front")
+    pdf.divider()
+    pdf.key_values([
+        ("✔ Total Canceled Savings:", f"${total_savings:,.0f} across {total_contracts} contracts"),
+        ("✔ Top Saving Agency:", str(top_agency)),
+        ("✔ Most Impacted Vendor:", str(top_vendor)),
+        ("✔ Most Common Cancellation Day:", str(most_common_weekday)),
+        ("✔ Peak Month of Savings:", f"{m.peak_month} — ${m.peak_savings:,.0f}"),
+    ])
+    pdf.end_page()
+
+    # --- Table of Contents ---
+    pdf.title("Table of Contents")
+    pdf.paragraph("1. BLUF\n2. Summary\n3. Automated Insights\n4. Top 20 Agencies\n5. Top 20 Vendors\n6. Charts")
+    pdf.end_page()
+
+    # --- Summary ---
+    pdf.title("Summary")
+    pdf.paragraph("This report highlights key savings achieved through government contract cancellations.\nThe dashboard includes key metrics, trends, and automated insights from DOGE API.")
+    pdf.cursor -= 10
+    pdf.title("Key Metrics")
+    pdf.paragraph(
+        f"- Total Savings: ${total_savings:,.0f}\n"
+        f"- Total Contracts Canceled: {total_contracts}\n"
+        f"- Top Saving Agency: {top_agency}\n"
+        f"- Top Affected Vendor: {top_vendor}\n"
+        f"- Most Common Cancellation Day: {most_common_weekday}"
+    )
+    pdf.end_page()
+
+    # --- Automated Insights ---
+    pdf.title("Automated Insights")
+    pdf.divider()
+    insights = [
+        f"- {top_agency} saved the most: ${m.top_agency_savings:,.0f}.",
+        f"- {top_vendor} was most affected: ${m.top_vendor_savings:,.0f}.",
+        f"- Average monthly savings: ${m.monthly_avg:,.0f}.",
+        f"- Peak savings occurred in {m.peak_month} totaling ${m.peak_savings:,.0f}."
     ]
-}
-
-for key, buffer in chart_images.items():
-    if key not in chart_titles:
-        continue
-    reset_cursor()
-    c.setFont("Helvetica-Bold", 16)
-    c.drawCentredString(width / 2, height - margin, chart_titles[key])
-
-    image_reader = ImageReader(buffer)
-    # Adjusted height, vertical positioning, and spacing
-    img_width = 6.5 * inch
-    img_height = 4.75 * inch
-    img_x = margin
-    img_y = height - 450  # higher up the page
-
-    c.drawImage(image_reader, img_x, img_y, width=img_width, height=img_height, preserveAspectRatio=True, mask='auto')
-
-    # Auto Generated Caption and Insights
-    c.setFont("Helvetica-Oblique", 10)
-    c.drawCentredString(width / 2, height / 2 - 120, chart_captions.get(key, ""))
-
-    c.setFont("Helvetica", 12)
-    cursor = height / 2 - 150
-    for insight in chart_insights.get(key, []):
-        c.drawString(margin, cursor, insight)
-        cursor -= 14
-
-    draw_footer()
-    c.showPage()
-
-# --- Finalize PDF ---
-c.save()
+    pdf.paragraph("\n".join(insights))
+    pdf.end_page()
+
+    # --- Top 20 Agencies (Formatted Table) ---
+    pdf.title("Top 20 Agencies by Canceled Savings")
+    pdf.divider()
+    pdf.table(["Agency", "Savings"], [(agency, f"${savings:,.0f}") for agency, savings in zip(top_agency_sav.index, top_agency_sav.to_numpy())])
+    pdf.end_page()
+
+    # --- Top 20 Vendors (Formatted Table) ---
+    pdf.title("Top 20 Vendors by Canceled Value")
+    pdf.divider()
+    pdf.table(["Vendor", "Canceled Value"], [(vendor, f"${savings:,.0f}") for vendor, savings in zip(top_vendor_sav.index, top_vendor_sav.to_numpy())])
+    pdf.end_page()
+
+    # --- Charts with Captions and Auto Insights ---
+    top10_agencies = top_agency_sav.iloc[:10]
+    top10_vendors = top_vendor_sav.iloc[:10]
+    chart_pngs = {
+        "top_agencies": render_chart_png("barh", top10_agencies.index, top10_agencies.to_numpy(), "Top 10 Agencies by Total Savings"),
+        "top_vendors": render_chart_png("barh", top10_vendors.index, top10_vendors.to_numpy(), "Top 10 Vendors by Contract Value Lost"),
+        "monthly_savings": render_chart_png("line", monthly_sav.index, monthly_sav.values, "Monthly Contract Savings"),
+        "weekday": render_chart_png("bar", weekday_counts.index, weekday_counts.values, "Cancellations by Weekday"),
+    }
+
+    chart_titles = {
+        "top_agencies": "Top 10 Agencies by Total Savings",
+        "top_vendors": "Top 10 Vendors by Canceled Contract Value",
+        "monthly_savings": "Monthly Contract Savings",
+        "weekday": "Cancellations by Weekday"
+    }
+
+    chart_captions = {
+        "top_agencies": "Agencies with the highest total savings.",
+        "top_vendors": "Vendors most financially impacted.",
+        "monthly_savings": "Trends in cancellations by month.",
+        "weekday": "Most common days for cancellations."
+    }
+
+    chart_insights = {
+        "top_agencies": [
+            f"- {top_agency} led with ${m.top_agency_savings:,.0f} saved.",
+            f"- Total from Top 10 agencies: ${m.top10_agency_savings:,.0f}."
+        ],
+        "top_vendors": [
+            f"- {top_vendor} lost ${m.top_vendor_savings:,.0f}.",
+            f"- Total from Top 10 vendors: ${m.top10_vendor_savings:,.0f}."
+        ],
+        "monthly_savings": [
+            f"- Peak month was {m.peak_month} with ${m.peak_savings:,.0f}.",
+            f"- Monthly average savings: ${m.monthly_avg:,.0f}."
+        ],
+        "weekday": [
+            f"- Most cancellations on {most_common_weekday}.",
+            f"- Weekday with fewest cancellations: {m.least_common_weekday}."
+        ]
+    }
+
+    for key, png in chart_pngs.items():
+        pdf.chart_page(chart_titles[key], png, chart_captions[key], chart_insights[key])
+
+    # --- Finalize PDF ---
+    pdf.save()
+    return pdf_buffer.getvalue()
+
+# Built only for the filters the report was requested with
+pdf_filters = (tuple(agencies), tuple(vendors))
+if st.button("🛠️ Generate PDF Report"):
+    st.session_state["contract_pdf_filters"] = pdf_filters
+
+if st.session_state.get("contract_pdf_filters") == pdf_filters:
+    pdf_bytes = build_pdf(
+        total_savings, total_contracts, top_agency, top_vendor, most_common_weekday,
+        agency_sav, vendor_sav, monthly_sav, weekday_counts,
+    )
 
-with open(pdf_output_path, "rb") as pdf_file:
     st.download_button(
         label="📄 Download PDF Report",
-        data=pdf_file.read(),
-        file_name=pdf_output_path.split("/")[-1],
+        data=pdf_bytes,
+        file_name=f"DOGE_Contract_Summary_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
         mime="application/pdf"
-    )
\ No newline at end of file
+    )
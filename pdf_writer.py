@@ -0,0 +1,131 @@
+from datetime import datetime
+from io import BytesIO
+from xml.sax.saxutils import escape
+from reportlab.lib.pagesizes import LETTER
+from reportlab.lib.units import inch
+from reportlab.lib.utils import ImageReader
+from reportlab.lib.colors import HexColor
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Paragraph, Table, TableStyle
+
+# --- PDF Report Layout ---
+FOOTER_TEXT = "Built by Richie Garafola • RichieGarafola@hotmail.com • github.com/RichieGarafola"
+# Parsed once, not per helper call
+BRAND_BLUE = HexColor("#003366")
+BLACK = HexColor("#000000")
+DIVIDER_GRAY = HexColor("#888888")
+TABLE_CELL = ParagraphStyle("table_cell", fontName="Courier", fontSize=11, leading=13)
+
+# Same chart geometry on every chart page
+CHART_WIDTH = 6.5 * inch
+CHART_HEIGHT = 4.75 * inch
+
+class PDFWriter:
+    # Layout state per report build, not in module globals
+    def __init__(self, buffer, pagesize=LETTER, margin=50, line_height=16):
+        self.c = canvas.Canvas(buffer, pagesize=pagesize)
+        self.width, self.height = pagesize
+        self.margin = margin
+        self.line_height = line_height
+        self.cursor = self.height - margin
+        self.page_number = 1
+
+    def reset_cursor(self):
+        self.cursor = self.height - self.margin
+
+    def end_page(self):
+        self.footer()
+        self.c.showPage()
+        self.reset_cursor()
+
+    def cover(self, title):
+        c = self.c
+        generated_on = datetime.now().strftime('%B %d, %Y at %I:%M %p')
+        cover_lines = [  # (font, size, fill color, y, text), all centred
+            ("Helvetica-Bold", 24, BRAND_BLUE, self.height - 100, title),
+            ("Helvetica", 16, BLACK, self.height - 140, "Department of Government Efficiency"),
+            ("Helvetica", 12, BLACK, self.height - 180, f"Generated on {generated_on}"),
+        ]
+        for font, size, color, y, text in cover_lines:
+            c.setFont(font, size)
+            c.setFillColor(color)
+            c.drawCentredString(self.width / 2, y, text)
+        self.end_page()
+
+    def title(self, title):
+        c = self.c
+        c.setFont("Helvetica-Bold", 18)
+        c.setFillColor(BRAND_BLUE)
+        c.drawString(self.margin, self.cursor, title)
+        c.setFillColor(BLACK)
+        self.cursor -= 30
+
+    def divider(self):
+        c = self.c
+        c.setStrokeColor(DIVIDER_GRAY)
+        c.line(self.margin, self.cursor, self.width - self.margin, self.cursor)
+        self.cursor -= 10
+
+    def paragraph(self, text):
+        # One text object per paragraph
+        lines = text.split("\n")
+        paragraph = self.c.beginText(self.margin, self.cursor)
+        paragraph.setFont("Helvetica", 12, leading=self.line_height)
+        paragraph.textLines(lines)
+        self.c.drawText(paragraph)
+        self.cursor -= len(lines) * self.line_height
+
+    def key_values(self, items):
+        # Bold label, indented value, blank line; one text object
+        line_height = self.line_height
+        block = self.c.beginText(self.margin, self.cursor)
+        for label, value in items:
+            block.setFont("Helvetica-Bold", 12, leading=line_height)
+            block.textLine(label)
+            block.setFont("Helvetica", 12, leading=line_height)
+            block.moveCursor(20, 0)
+            block.textLine(value)
+            block.moveCursor(-20, line_height)
+        self.c.drawText(block)
+        self.cursor -= len(items) * 3 * line_height
+
+    def table(self, header, rows):
+        # Paragraph cells so long names wrap instead of overrunning the amounts
+        content_width = self.width - 2 * self.margin
+        body = [[Paragraph(escape(str(name)), TABLE_CELL), amount] for name, amount in rows]
+        table = Table([header] + body, colWidths=[content_width - 130, 130], repeatRows=1)
+        table.setStyle(TableStyle([
+            ("FONT", (0, 0), (-1, 0), "Helvetica-Bold", 11),
+            ("FONT", (0, 1), (-1, -1), "Courier", 11),
+            ("ALIGN", (1, 0), (1, -1), "RIGHT"),
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+            ("LINEBELOW", (0, 0), (-1, 0), 0.5, DIVIDER_GRAY),
+        ]))
+        _, table_height = table.wrapOn(self.c, content_width, self.cursor)
+        table.drawOn(self.c, self.margin, self.cursor - table_height)
+        self.cursor -= table_height
+
+    def chart_page(self, title, png, caption, insights):
+        c = self.c
+        img_y = self.height - 450
+        c.setFont("Helvetica-Bold", 16)
+        c.drawCentredString(self.width / 2, self.height - self.margin, title)
+        c.drawImage(ImageReader(BytesIO(png)), self.margin, img_y, width=CHART_WIDTH, height=CHART_HEIGHT, preserveAspectRatio=True, mask='auto')
+        c.setFont("Helvetica-Oblique", 10)
+        c.drawCentredString(self.width / 2, img_y - 20, caption)
+        bullets = c.beginText(self.margin, img_y - 40)
+        bullets.setFont("Helvetica", 12, leading=14)
+        bullets.textLines(insights)
+        c.drawText(bullets)
+        self.end_page()
+
+    def footer(self):
+        c = self.c
+        c.setFont("Helvetica-Oblique", 9)
+        c.drawString(self.margin, 20, FOOTER_TEXT)
+        c.drawRightString(self.width - self.margin, 20, f"Page {self.page_number}")
+        self.page_number += 1
+
+    def save(self):
+        self.c.save()